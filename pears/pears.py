@@ -1,24 +1,272 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
-from fastkde import fastKDE
+from matplotlib.collections import LineCollection
 from scipy.ndimage import gaussian_filter
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
-def kde1d(data):
+try:
+    import contourpy  # the contouring backend of matplotlib >= 3.6
+except ImportError:
+    contourpy = None
+
+# matplotlib < 3.6 contours with its own backend even when contourpy is
+# installed, and lacks the contour.algorithm setting the fast path follows
+if "contour.algorithm" not in matplotlib.rcParams:
+    contourpy = None
+
+
+def _sorted_quantile(x, q):
+    """Same as `np.quantile(x, q)`, by index arithmetic on the sorted `x`."""
+    pos = np.asarray(q) * (len(x) - 1)
+    lo = np.floor(pos).astype(int)
+    hi = np.minimum(lo + 1, len(x) - 1)
+    return x[lo] + (pos - lo) * (x[hi] - x[lo])
+
+
+def _bandwidth(x, d=1):
+    """
+    Silverman's rule-of-thumb bandwidth for a `d`-dimensional Gaussian KDE of
+    the sorted `x`.
+    """
+    sigma = np.std(x)
+    iqr = np.subtract(*_sorted_quantile(x, [0.75, 0.25])) / 1.349
+    if 0 < iqr < sigma:
+        sigma = iqr
+    if sigma == 0:
+        sigma = 1.0
+    return (4 / (d + 2)) ** (1 / (d + 4)) * sigma * len(x) ** (-1 / (d + 4))
+
+
+def _grid(x, h, size):
+    """Evenly spaced evaluation grid covering the sorted `x`, padded by `3 * h`."""
+    return np.linspace(x[0] - 3 * h, x[-1] + 3 * h, size)
+
+
+def _bin_index(x, lo, hi, size):
+    """Left grid neighbour of each of `x`, and its distance to it in cells."""
+    t = (x - lo) / (hi - lo) * (size - 1)
+    k = np.clip(np.floor(t).astype(int), 0, size - 2)
+    return k, t - k
+
+
+def _linbin_numpy(x, lo, hi, size):
+    """Linearly bin `x` onto `size` evenly spaced grid points spanning [lo, hi]."""
+    k, f = _bin_index(x, lo, hi, size)
+    return np.bincount(k, 1 - f, size) + np.bincount(k + 1, f, size)
+
+
+def _linbin2d_numpy(x, y, xlo, xhi, ylo, yhi, size):
+    """Bilinearly bin (`x`, `y`) onto a `size` x `size` grid, indexed [y, x]."""
+    kx, fx = _bin_index(x, xlo, xhi, size)
+    ky, fy = _bin_index(y, ylo, yhi, size)
+    k = ky * size + kx
+    out = np.zeros(size * size)
+    for dk, w in (
+        (0, (1 - fy) * (1 - fx)),
+        (1, (1 - fy) * fx),
+        (size, fy * (1 - fx)),
+        (size + 1, fy * fx),
+    ):
+        out += np.bincount(k + dk, w, size * size)
+    return out.reshape(size, size)
+
+
+def _linbin_numba(x, lo, hi, size):
+    out = np.zeros(size)
+    delta = (hi - lo) / (size - 1)
+    for v in x:
+        t = (v - lo) / delta
+        k = min(max(int(t), 0), size - 2)
+        f = t - k
+        out[k] += 1 - f
+        out[k + 1] += f
+    return out
+
+
+def _linbin2d_numba(x, y, xlo, xhi, ylo, yhi, size):
+    out = np.zeros((size, size))
+    dx = (xhi - xlo) / (size - 1)
+    dy = (yhi - ylo) / (size - 1)
+    for n in range(len(x)):
+        tx = (x[n] - xlo) / dx
+        ty = (y[n] - ylo) / dy
+        kx = min(max(int(tx), 0), size - 2)
+        ky = min(max(int(ty), 0), size - 2)
+        fx = tx - kx
+        fy = ty - ky
+        out[ky, kx] += (1 - fy) * (1 - fx)
+        out[ky, kx + 1] += (1 - fy) * fx
+        out[ky + 1, kx] += fy * (1 - fx)
+        out[ky + 1, kx + 1] += fy * fx
+    return out
+
+
+# the binning is a scalar loop over every sample, so use numba when available
+if njit is None:
+    _linbin, _linbin2d = _linbin_numpy, _linbin2d_numpy
+else:
+    _jit = njit(cache=True, fastmath=True, nogil=True)
+    _linbin, _linbin2d = _jit(_linbin_numba), _jit(_linbin2d_numba)
+
+
+@lru_cache(maxsize=256)
+def _kernel_fft(sigma, size, real=True):
+    """
+    Fourier transform of a Gaussian with standard deviation `sigma` (in grid
+    cells), for a signal of length `size` zero-padded to `2 * size`.
+    """
+    freq = np.fft.rfftfreq(2 * size) if real else np.fft.fftfreq(2 * size)
+    return np.exp(-0.5 * (2 * np.pi * freq * sigma) ** 2)
+
+
+def _fast_kde_1d(x, grid=256):
+    """Binned Gaussian KDE of the sorted `x`, convolved with the kernel via FFT."""
+    h = _bandwidth(x)
+    xs = _grid(x, h, grid)
+    dx = xs[1] - xs[0]
+    counts = _linbin(x, xs[0], xs[-1], grid)
+    f = np.fft.rfft(counts, 2 * grid) * _kernel_fft(h / dx, grid)
+    pdf = np.fft.irfft(f, 2 * grid)[:grid] / (len(x) * dx)
+    return xs, np.clip(pdf, 0, None)
+
+
+def _kde_axis(x, grid, d=1):
+    """Bandwidth and evaluation grid along one dimension of a KDE of sorted `x`."""
+    h = _bandwidth(x, d=d)
+    return h, _grid(x, h, grid)
+
+
+def _fast_kde_2d(x, y, grid=128, xaxis=None, yaxis=None):
+    """
+    Binned Gaussian KDE of (`x`, `y`), convolved with the kernel via FFT.
+
+    `xaxis` and `yaxis` are precomputed `_kde_axis` results, so that a
+    variable's bandwidth and grid can be shared by every pair it is in.
+    """
+    hx, xs = _kde_axis(np.sort(x), grid, d=2) if xaxis is None else xaxis
+    hy, ys = _kde_axis(np.sort(y), grid, d=2) if yaxis is None else yaxis
+    grid = len(xs)
+    dx, dy = xs[1] - xs[0], ys[1] - ys[0]
+    counts = _linbin2d(x, y, xs[0], xs[-1], ys[0], ys[-1], grid)
+    kernel = np.outer(
+        _kernel_fft(hy / dy, grid, real=False), _kernel_fft(hx / dx, grid)
+    )
+    f = np.fft.rfft2(counts, s=(2 * grid, 2 * grid)) * kernel
+    pdf = np.fft.irfft2(f, s=(2 * grid, 2 * grid))[:grid, :grid] / (len(x) * dx * dy)
+    return [xs, ys], np.clip(pdf, 0, None)
+
+
+def kde1d(data, grid=256):
     mask = np.asarray(np.isfinite(data), dtype=bool)
-    return fastKDE.pdf(data[mask])[::-1]
+    return _fast_kde_1d(np.sort(data[mask]), grid=grid)
+
+
+def kde2d(x, y, grid=128):
+    mask = np.asarray(np.isfinite(x) & np.isfinite(y), dtype=bool)
+    return _fast_kde_2d(x[mask], y[mask], grid=grid)
 
 
-def kde2d(x, y):
+def _kde2d_shared(x, y, xaxis, yaxis):
     mask = np.asarray(np.isfinite(x) & np.isfinite(y), dtype=bool)
-    return fastKDE.pdf(x[mask], y[mask])[::-1]
+    return _fast_kde_2d(x[mask], y[mask], xaxis=xaxis, yaxis=yaxis)
+
+
+def _autoscale_limits(*values, margin=0.05):
+    """
+    Limits that matplotlib would autoscale to for artists spanning `values`
+    (ignoring Nones and non-finite values), padded by `margin` of the data
+    range on each side.
+    """
+    values = [np.ravel(v) for v in values if v is not None]
+    values = [v[np.isfinite(v)] for v in values]
+    lo = min(v.min() for v in values if v.size)
+    hi = max(v.max() for v in values if v.size)
+    # widen a zero range as the axis locator would, e.g. for a constant column
+    lo, hi = matplotlib.ticker.AutoLocator().nonsingular(lo, hi)
+    pad = margin * (hi - lo)
+    return lo - pad, hi + pad
+
+
+def _limits(sorted_cols, quantiles=None):
+    """
+    Return an (n, 2) array of axis limits, one row per sorted (finite) column.
+
+    Limits are given by `quantiles` if passed, otherwise by the range of the
+    data. Both are lookups into the sorted columns.
+    """
+    if quantiles is None:
+        return np.array([(s[0], s[-1]) for s in sorted_cols])
+    return np.array([_sorted_quantile(s, quantiles)[:2] for s in sorted_cols])
+
+
+# tags the marginal KDE lines, so later calls can count the datasets plotted
+_MARGINAL_GID = "pears-marginal"
 
 
-def _min_max(x):
-    return np.nanmin(x), np.nanmax(x)
+# scatter keyword arguments with a direct equivalent for `plot` markers
+_SCATTER_TO_PLOT = dict(
+    color="color",
+    edgecolor="markeredgecolor",
+    edgecolors="markeredgecolor",
+    facecolor="markerfacecolor",
+    facecolors="markerfacecolor",
+    linewidths="markeredgewidth",
+    marker="marker",
+    alpha="alpha",
+    rasterized="rasterized",
+    zorder="zorder",
+    label="label",
+)
+
+
+def _plot_marker_kwargs(kwargs):
+    """
+    Translate `scatter` keyword arguments into ones for `plot` markers.
+
+    A single-colored point cloud is much cheaper to draw (and to pan/zoom) as
+    a `Line2D` with markers than as a `PathCollection`. Returns None if the
+    points need per-point styling (e.g., `c`, or an array-valued `s`, `alpha`
+    or color), in which case `scatter` has to be used.
+    """
+    color_keys = ("color", "edgecolor", "edgecolors", "facecolor", "facecolors")
+    if not (
+        set(kwargs) <= set(_SCATTER_TO_PLOT) | {"s"}
+        # per-point sizes, linewidths, alpha, ... have no plot equivalent
+        and all(
+            np.ndim(v) == 0
+            for k, v in kwargs.items()
+            if k not in color_keys and k != "marker"
+        )
+        and all(
+            matplotlib.colors.is_color_like(kwargs[k])
+            for k in color_keys
+            if k in kwargs
+        )
+    ):
+        return None
+
+    kwargs = dict(kwargs)
+    plot_kwargs = dict(
+        linestyle="none",
+        marker=matplotlib.rcParams["scatter.marker"],
+        markeredgewidth=matplotlib.rcParams["lines.linewidth"],
+        markersize=np.sqrt(
+            kwargs.pop("s", matplotlib.rcParams["lines.markersize"] ** 2)
+        ),
+    )
+    if "color" in kwargs:
+        plot_kwargs["markerfacecolor"] = kwargs["color"]
+    plot_kwargs.update({_SCATTER_TO_PLOT[k]: v for k, v in kwargs.items()})
+    return plot_kwargs
 
 
 def _set_axis_edge_color(ax, color):
@@ -27,19 +275,63 @@ def _set_axis_edge_color(ax, color):
         spine.set_edgecolor(color)
 
 
+def _contour_lines(ax, x, y, z, levels, cmap=None, colors=None):
+    """
+    Lightweight version of `ax.contour` for line contours.
+
+    The contour lines of `z` are drawn as a single `LineCollection`, skipping
+    the `QuadContourSet` machinery (labels, legends, negative linestyles).
+    Lines are colored the way `contour` does it: by `colors` if passed,
+    otherwise by `cmap` normalized over the levels.
+    """
+    if colors is not None:
+        rgba = matplotlib.colors.to_rgba_array(colors)
+    else:
+        rgba = plt.get_cmap(cmap)(matplotlib.colors.Normalize()(levels))
+    gen = contourpy.contour_generator(
+        x,
+        y,
+        z,
+        name=matplotlib.rcParams["contour.algorithm"],
+        corner_mask=matplotlib.rcParams["contour.corner_mask"],
+        line_type="SeparateCode",
+    )
+    segments, segment_colors = [], []
+    for k, level in enumerate(levels):
+        lines, _ = gen.lines(level)
+        segments.extend(lines)
+        segment_colors.extend([rgba[k % len(rgba)]] * len(lines))
+    lc = ax.add_collection(
+        LineCollection(segments, colors=segment_colors), autolim=False
+    )
+    # like `contour`, autoscale tightly to the whole grid rather than the lines
+    lc.sticky_edges.x[:] = [x.min(), x.max()]
+    lc.sticky_edges.y[:] = [y.min(), y.max()]
+    ax.update_datalim([(x.min(), y.min()), (x.max(), y.max())])
+    ax.autoscale_view(tight=True)
+
+
 def quantile_to_level(data, quantile):
     """Return data levels corresponding to quantile cuts of mass."""
     isoprop = np.asarray(quantile)
     values = np.ravel(data)
     sorted_values = np.sort(values)[::-1]
-    normalized_values = np.cumsum(sorted_values) / values.sum()
+    normalized_values = np.cumsum(sorted_values, dtype=float)
+    normalized_values /= normalized_values[-1]
     idx = np.searchsorted(normalized_values, 1 - isoprop)
     levels = np.take(sorted_values, idx, mode="clip")
     return levels
 
 
 def contour2d(
-    x, y, z, quantiles=[0.1, 0.3, 0.5, 0.7, 0.9], ax=None, smoothing=2, **kwargs
+    x,
+    y,
+    z,
+    quantiles=[0.1, 0.3, 0.5, 0.7, 0.9],
+    ax=None,
+    smoothing=2,
+    levels=None,
+    **kwargs,
 ):
     """Plot 2D contours of a 2D distribution. This can be chained after `kde2d`.
 
@@ -58,10 +350,14 @@ def contour2d(
     smoothing: float
         Smoothing parameter for the density. Passed to `gaussian_filter`. Fixes jagged
         contours.
+    levels: np.ndarray
+        Precomputed contour levels (e.g., from `quantile_to_level`). If None, then
+        computed from `quantiles`.
     kwargs: ...
         Additional keyword arguments to pass to `plt.contour`.
     """
-    levels = quantile_to_level(z, quantiles)
+    if levels is None:
+        levels = quantile_to_level(z, quantiles)
     p = ax if ax is not None else plt
     p.contour(x, y, gaussian_filter(z, sigma=smoothing), levels=levels, **kwargs)
 
@@ -79,6 +375,7 @@ def pears(
     scatter_color: str = "#5E81AC",
     scatter_alpha: float = 0.2,
     scatter_thin: Optional[int] = None,
+    scatter_max_points: Optional[int] = 20000,
     scatter_rasterized: bool = True,
     scatter_kwargs: Optional[Dict] = None,
     truths_color: str = "#2E3440",
@@ -90,6 +387,7 @@ def pears(
     kde_quantiles: List[float] = [0.1, 0.3, 0.5, 0.7, 0.9],
     kde_smoothing: float = 2.0,
     kde_fill: bool = False,
+    kde_workers: Optional[int] = None,
     xlim_quantiles: Optional[List[float]] = None,
     ylim_quantiles: Optional[List[float]] = None,
     figsize_scaling: float = 2.2,
@@ -168,8 +466,15 @@ def pears(
         Thin the dataset by this factor before plotting the scatterplot.
         Use this to speed up plotting.
 
+    scatter_max_points: Optional[int]
+        Maximum number of points in each scatterplot. If there are more (after
+        thinning by `scatter_thin`), a fixed random subsample of this size is
+        plotted instead, which bounds the plotting cost for very large datasets.
+        If None, then plots all of them.
+
     scatter_rasterized: bool
-        Whether to rasterize the scatterplot.
+        Whether to rasterize the scatterplot. The points are drawn below the
+        rasterization zorder of each panel, so everything else stays vector.
 
     scatter_kwargs: Optional[Dict]
         Additional keyword arguments to pass to `plt.scatter`.
@@ -202,6 +507,10 @@ def pears(
     kde_fill: bool
         Whether to fill the KDE contours (using plt.contourf instead of plt.contour).
 
+    kde_workers: Optional[int]
+        Number of threads used to compute the KDEs. If None, uses the
+        `concurrent.futures.ThreadPoolExecutor` default.
+
     xlim_quantiles: Optional[List[float]]
         Quantiles to use for the x-axis limits. If None, uses the
         range of the data (min and max).
@@ -238,7 +547,8 @@ def pears(
         Top level container with all the plot elements.
 
     ax: Optional[matplotlib.axes.SubplotBase]
-        Axes with matplotlib subplots (2D array of panels).
+        Axes with matplotlib subplots (2D array of panels), as returned by a
+        previous call.
 
     alt_marginal_colors / alt_scatter_colors / alt_truths_colors / alt_kde_colors / alt_cmaps: list[str]
         Alternative colors/cmaps to use for the marginal, scatter, truths, and kde plots.
@@ -252,7 +562,8 @@ def pears(
         Top level container with all the plot elements.
 
     ax: matplotlib.axes.SubplotBase
-        Axes with matplotlib subplots (2D array of panels).
+        Axes with matplotlib subplots (2D array of panels). Only the diagonal
+        and lower panels are created, entries above the diagonal are None.
     """
 
     if hasattr(dataset, "shape"):
@@ -264,7 +575,9 @@ def pears(
     if fig is None or ax is None:
         run_num = 0
     else:
-        run_num = len(ax[0, 0].lines)
+        # count previous datasets by their marginal lines, since the number of
+        # truth lines drawn per dataset varies
+        run_num = sum(line.get_gid() == _MARGINAL_GID for line in ax[0, 0].lines)
 
     if run_num > 0:
         marginal_color = alt_marginal_colors[run_num % len(alt_marginal_colors)]
@@ -276,21 +589,33 @@ def pears(
     marginal_kwargs = dict(
         color=marginal_color,
         linewidth=marginal_lw,
+        gid=_MARGINAL_GID,
     )
 
     scatter_args = dict(
         color=scatter_color,
         alpha=scatter_alpha,
-        rasterized=scatter_rasterized,
         edgecolor=scatter_color,
         s=10,
     )
 
+    if scatter_rasterized:
+        # draw below the axes' rasterization zorder so that each panel's points
+        # are rasterized together while the contours and lines stay vector
+        scatter_args["zorder"] = -1
+
     if scatter_kwargs:
+        if "c" in scatter_kwargs:
+            # per-point colors conflict with the single default color
+            scatter_args.pop("color")
         scatter_args.update(scatter_kwargs)
 
+    # None if the points have to be drawn with `scatter`
+    marker_args = _plot_marker_kwargs(scatter_args)
+
     kde_kwargs = dict(
-        cmap=kde_cmap,  # cmap has priority
+        # cmap has priority; look it up once rather than in every panel
+        cmap=plt.get_cmap(kde_cmap) if kde_cmap else None,
         colors=None if kde_cmap else kde_color,
     )
 
@@ -311,51 +636,104 @@ def pears(
 
     assert indices is not None
 
+    # index the dataset once per variable rather than once per panel
+    cols = [np.asarray(dataset[idx]) for idx in indices]
+    # sorted finite values give the limits, summaries, and KDE bandwidths and
+    # ranges of each variable by lookup, so only one pass over the data is needed
+    sorted_cols = [np.sort(c[np.isfinite(c)]) for c in cols]
+
     if scatter_thin is None:
-        num_points = len(dataset[indices[0]])
+        num_points = len(cols[0])
         scatter_thin = max(1, num_points // 1000)  # limit to 1000 points
 
+    # compact copies of the thinned columns, shared by every scatter panel
+    scatter_cols = [np.ascontiguousarray(c[::scatter_thin]) for c in cols]
+
+    num_scatter = len(scatter_cols[0])
+    if scatter_max_points is not None and num_scatter > scatter_max_points:
+        # a random subsample rather than a coarser stride, which would keep any
+        # ordering artefacts in the data (e.g., correlated MCMC chains)
+        rng = np.random.default_rng(0)
+        idx = np.sort(rng.choice(num_scatter, scatter_max_points, replace=False))
+        scatter_cols = [c[idx] for c in scatter_cols]
+        # per-point styling has to follow the same subsample; single colors
+        # such as c=(1, 0, 0) are sequences too, so match on the length
+        for k, v in scatter_args.items():
+            if np.shape(v)[:1] == (num_scatter,):
+                scatter_args[k] = np.asarray(v)[idx]
+
+    # convert quantile lists to arrays once rather than once per panel
+    xq = np.asarray(xlim_quantiles) if xlim_quantiles else None
+    yq = np.asarray(ylim_quantiles) if ylim_quantiles else None
+    kq = np.asarray(kde_quantiles)
+
+    xlims = _limits(sorted_cols, xq)
+    # by default both axes span the data range, so only scan the data once
+    ylims = xlims if np.array_equal(xq, yq) else _limits(sorted_cols, yq)
+
     n = len(indices)
 
     if truths is not None:
         assert len(truths) == n
 
     if run_num == 0:
-        fig, ax = plt.subplots(
-            n,
-            n,
-            figsize=(n * figsize_scaling + 1, n * figsize_scaling + 1),
-            gridspec_kw=dict(hspace=hspace, wspace=wspace),  # fmt: skip
-        )
+        # the panel spacing is set through the gridspec, so make sure a layout
+        # engine from the user's rcParams doesn't redo the layout on each draw
+        with matplotlib.rc_context(
+            {"figure.autolayout": False, "figure.constrained_layout.use": False}
+        ):
+            fig = plt.figure(figsize=(n * figsize_scaling + 1, n * figsize_scaling + 1))
+        gs = fig.add_gridspec(n, n, hspace=hspace, wspace=wspace)
+        # only the diagonal and lower panels are used, so don't create the rest
+        ax = np.empty((n, n), dtype=object)
+        for i, j in zip(*np.tril_indices(n)):
+            ax[i, j] = fig.add_subplot(gs[i, j])
     assert fig is not None and ax is not None
     assert isinstance(ax, np.ndarray)
     assert ax.shape == (n, n)
 
-    for i in np.arange(n):
-        # turn off upper panels
-        for j in np.arange(i + 1, n):
-            ax[i, j].axis("off")
+    # the KDEs are independent of each other and of the plotting, so compute
+    # them all up front in a thread pool (the FFTs release the GIL)
+    pairs = [(j, i) for i in range(n) for j in range(i)] if kde else []
+    with ThreadPoolExecutor(max_workers=kde_workers) as executor:
+        marginals = list(executor.map(_fast_kde_1d, sorted_cols))
+        # bandwidths and grids only depend on the variable, not the pair
+        kde_axes = [_kde_axis(s, 128, d=2) for s in sorted_cols] if kde else []
+        joints = executor.map(
+            lambda p: _kde2d_shared(
+                cols[p[0]], cols[p[1]], kde_axes[p[0]], kde_axes[p[1]]
+            ),
+            pairs,
+        )
+        joints = dict(zip(pairs, joints))
+
+    # limits are set explicitly below, so the panels with explicit limits don't
+    # autoscale to their artists; on the first run we work out what autoscaling
+    # would have given, on later runs the limits already on the axes are used
+    xmargin = matplotlib.rcParams["axes.xmargin"]
+    ymargin = matplotlib.rcParams["axes.ymargin"]
+    _truths = truths if truths is not None else [None] * n
 
+    for i in np.arange(n):
         # marginal densities in diagonals
-        x, y = kde1d(dataset[indices[i]])
+        x, y = marginals[i]
+        ax[i, i].set_autoscalex_on(False)
         ax[i, i].plot(x, y, **marginal_kwargs)
 
-        if truths is not None:
-            ax[i, i].axvline(truths[i], **truths_args)
-
         _set_axis_edge_color(ax[i, i], "black")
 
-        _xlim = ax[i, i].get_xlim()
-
-        if xlim_quantiles:
-            xlim = np.nanquantile(dataset[indices[i]], np.array(xlim_quantiles))
+        if run_num == 0:
+            _xlim = _autoscale_limits(x, _truths[i], margin=xmargin)
         else:
-            xlim = _min_max(dataset[indices[i]])
-
-        xlim = (min(xlim[0], _xlim[0]), max(xlim[1], _xlim[1]))
+            _xlim = ax[i, i].get_xlim()
+        xlim = (min(xlims[i, 0], _xlim[0]), max(xlims[i, 1], _xlim[1]))
 
         ax[i, i].set_xlim(*xlim)
 
+        # truths outside the panel (only possible when overlaying) aren't drawn
+        if truths is not None and xlim[0] <= truths[i] <= xlim[1]:
+            ax[i, i].axvline(truths[i], **truths_args)
+
         if annotate:
             ax[i, i].annotate(
                 labels[i] if labels is not None else indices[i],
@@ -365,9 +743,7 @@ def pears(
             )
 
         if summarize:
-            lower, median, upper = np.nanquantile(
-                dataset[indices[i]], [0.16, 0.5, 0.84]
-            )
+            lower, median, upper = _sorted_quantile(sorted_cols[i], [0.16, 0.5, 0.84])
             ax[i, i].set_title(
                 f"{labels[i] if labels is not None else indices[i]} = ${median:.2f}^{{+{upper - median:.2f}}}_{{-{median - lower:.2f}}}$",
                 fontsize=fontsize_summary,
@@ -377,106 +753,101 @@ def pears(
         for j in np.arange(i):
             # scatter pairs
             if scatter:
-                ax[i, j].scatter(
-                    dataset[indices[j]][::scatter_thin],
-                    dataset[indices[i]][::scatter_thin],
-                    **scatter_args,
-                )
-
-                if truths is not None:
-                    ax[i, j].axvline(truths[j], **truths_args)
-                    ax[i, j].axhline(truths[i], **truths_args)
-
-                _xlim = ax[i, j].get_xlim()
-
-                if xlim_quantiles:
-                    xlim = np.nanquantile(dataset[indices[j]], np.array(xlim_quantiles))
+                if scatter_rasterized:
+                    ax[i, j].set_rasterization_zorder(0)
+                ax[i, j].set_autoscale_on(False)
+                if marker_args is not None:
+                    ax[i, j].plot(scatter_cols[j], scatter_cols[i], **marker_args)
                 else:
-                    xlim = _min_max(dataset[indices[j]])
-
-                xlim = (min(xlim[0], _xlim[0]), max(xlim[1], _xlim[1]))
+                    ax[i, j].scatter(scatter_cols[j], scatter_cols[i], **scatter_args)
 
-                ax[i, j].set_xlim(*xlim)
-
-                _ylim = ax[i, j].get_ylim()
-
-                if ylim_quantiles:
-                    ylim = np.nanquantile(dataset[indices[i]], np.array(ylim_quantiles))
+                if run_num == 0:
+                    _xlim = _autoscale_limits(
+                        scatter_cols[j], _truths[j], margin=xmargin
+                    )
+                    _ylim = _autoscale_limits(
+                        scatter_cols[i], _truths[i], margin=ymargin
+                    )
                 else:
-                    ylim = _min_max(dataset[indices[i]])
+                    _xlim, _ylim = ax[i, j].get_xlim(), ax[i, j].get_ylim()
 
-                ylim = (min(ylim[0], _ylim[0]), max(ylim[1], _ylim[1]))
+                xlim = (min(xlims[j, 0], _xlim[0]), max(xlims[j, 1], _xlim[1]))
+                ax[i, j].set_xlim(*xlim)
 
+                ylim = (min(ylims[i, 0], _ylim[0]), max(ylims[i, 1], _ylim[1]))
                 ax[i, j].set_ylim(*ylim)
 
+                if truths is not None:
+                    if xlim[0] <= truths[j] <= xlim[1]:
+                        ax[i, j].axvline(truths[j], **truths_args)
+                    if ylim[0] <= truths[i] <= ylim[1]:
+                        ax[i, j].axhline(truths[i], **truths_args)
+
                 _set_axis_edge_color(ax[i, j], "black")
 
             if kde:
                 # kde contours on top
-                xy, z = kde2d(dataset[indices[j]], dataset[indices[i]])
+                xy, z = joints[j, i]
                 x, y = xy
-                levels = quantile_to_level(z, kde_quantiles)
+                levels = quantile_to_level(z, kq)
                 if kde_fill:
                     ax[i, j].contourf(x, y, z, levels=levels, **kde_kwargs)
+                elif contourpy is not None:
+                    _contour_lines(
+                        ax[i, j],
+                        x,
+                        y,
+                        gaussian_filter(z, sigma=kde_smoothing),
+                        levels,
+                        **kde_kwargs,
+                    )
                 else:
                     contour2d(
                         x,
                         y,
                         z,
-                        quantiles=kde_quantiles,
                         ax=ax[i, j],
                         smoothing=kde_smoothing,
+                        levels=levels,
                         **kde_kwargs,
                     )
 
-        for j in np.arange(n):
-            # hacky way to try to make tick positions consistent
-            ax[i, j].yaxis.set_major_locator(plt.MaxNLocator(4))
-            ax[i, j].xaxis.set_major_locator(plt.MaxNLocator(4))
-
-            # left column:
-            #   add label if not diagonal
-            #   make the tick labels bigger
-            #   rotate tick labels
-            if j == 0:
-                if i != j:
-                    ax[i, j].set_ylabel(
-                        labels[i] if labels else indices[i], fontsize=fontsize_labels
-                    )
-                ax[i, j].tick_params(
-                    labelsize=fontsize_ticks, labelrotation=45, axis="y"
-                )
-
-            # not left column: turn off y tick labels
-            else:
-                ax[i, j].set_yticklabels([])
-
-            # bottom row:
-            #   add labels
-            #   make tick labels bigger
-            #   rotate tick labels
-            if i == n - 1:
-                ax[i, j].set_xlabel(
-                    labels[j] if labels else indices[j], fontsize=fontsize_labels
-                )
-                ax[i, j].tick_params(
-                    labelsize=fontsize_ticks, labelrotation=45, axis="x"
-                )
-
-            # not bottom row: turn off x tick labels
-            else:
-                ax[i, j].set_xticklabels([])
-
-            # diagonals are special
-            if i == j:
-                # unless bottom one, remove x labels
-                if j != n - 1:
-                    ax[i, j].set_xticklabels([])
-                    ax[i, j].xaxis.label.set_visible(False)
-
-                # remove y ticks for all
-                ax[i, j].set_yticks([])
-                ax[i, j].set_yticklabels([])
-                ax[i, j].yaxis.label.set_visible(False)
+    # styling is applied to whole rows/columns at once, after all the data
+    for a in ax[np.tril_indices(n)]:
+        # hacky way to try to make tick positions consistent
+        # (a locator belongs to one axis, so each needs its own)
+        a.yaxis.set_major_locator(plt.MaxNLocator(4))
+        a.xaxis.set_major_locator(plt.MaxNLocator(4))
+
+    # left column:
+    #   add label if not diagonal
+    #   make the tick labels bigger
+    #   rotate tick labels
+    for i in range(1, n):
+        ax[i, 0].set_ylabel(
+            labels[i] if labels else indices[i], fontsize=fontsize_labels
+        )
+    for a in ax[:, 0]:
+        a.tick_params(labelsize=fontsize_ticks, labelrotation=45, axis="y")
+
+    # not left column: turn off y tick labels
+    plt.setp([a for a in ax[:, 1:].flat if a is not None], yticklabels=[])
+
+    # bottom row:
+    #   add labels
+    #   make tick labels bigger
+    #   rotate tick labels
+    for j in range(n):
+        ax[-1, j].set_xlabel(
+            labels[j] if labels else indices[j], fontsize=fontsize_labels
+        )
+        ax[-1, j].tick_params(labelsize=fontsize_ticks, labelrotation=45, axis="x")
+
+    # not bottom row: turn off x tick labels
+    plt.setp([a for a in ax[:-1].flat if a is not None], xticklabels=[])
+
+    # diagonals are special: remove y ticks for all
+    plt.setp(ax.diagonal(), yticks=[], yticklabels=[])
+    plt.setp([a.yaxis.label for a in ax.diagonal()], visible=False)
 
     return fig, ax
@@ -0,0 +1,51 @@
+import numpy as np
+from scipy.stats import gaussian_kde
+
+from pears import kde1d, kde2d
+from pears.pears import _bandwidth
+
+
+def test_kde1d_normalized():
+    x = np.random.default_rng(0).normal(size=2000)
+    grid, pdf = kde1d(x)
+    assert np.isclose(np.trapz(pdf, grid), 1.0, atol=1e-3)
+
+
+def test_kde2d_normalized():
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=2000)
+    y = 0.5 * x + rng.normal(size=2000)
+    (xs, ys), pdf = kde2d(x, y)
+    assert pdf.shape == (len(ys), len(xs))
+    assert np.isclose(np.trapz(np.trapz(pdf, xs, axis=1), ys), 1.0, atol=1e-3)
+
+
+def test_kde1d_matches_gaussian_kde():
+    x = np.random.default_rng(2).normal(size=2000)
+    grid, pdf = kde1d(x)
+    h = _bandwidth(np.sort(x))
+    exact = gaussian_kde(x, bw_method=h / np.std(x, ddof=1))(grid)
+    assert np.max(np.abs(pdf - exact)) < 1e-3
+
+
+def test_kde2d_matches_direct_sum():
+    rng = np.random.default_rng(3)
+    x = rng.normal(size=500)
+    y = 0.5 * x + rng.normal(size=500)
+    (xs, ys), pdf = kde2d(x, y)
+    hx, hy = _bandwidth(np.sort(x), d=2), _bandwidth(np.sort(y), d=2)
+    for k, m in [(40, 60), (64, 64), (90, 30)]:
+        exact = np.mean(
+            np.exp(-0.5 * ((xs[m] - x) / hx) ** 2 - 0.5 * ((ys[k] - y) / hy) ** 2)
+        ) / (2 * np.pi * hx * hy)
+        assert np.isclose(pdf[k, m], exact, rtol=0.02, atol=1e-4)
+
+
+def test_contour2d_integer_density():
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from pears import contour2d
+
+    z = np.random.default_rng(0).integers(0, 10, (20, 20))
+    contour2d(np.arange(20), np.arange(20), z)
@@ -0,0 +1,119 @@
+import warnings
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pytest
+
+from pears import pears
+
+
+def _scatter_points(ax):
+    """The points drawn in a scatter panel, as plot markers or a collection."""
+    if ax.lines:
+        return np.column_stack(ax.lines[-1].get_data())
+    return ax.collections[-1].get_offsets()
+
+
+@pytest.mark.parametrize(
+    "scatter_kwargs",
+    [dict(c=(1, 0, 0)), dict(c=[0.2, 0.4, 0.6, 1.0]), dict(s=[5]), dict(s=5)],
+)
+def test_subsample_keeps_single_style(scatter_kwargs):
+    x = np.random.default_rng(0).normal(size=(3, 500))
+    fig, ax = pears(
+        x,
+        kde=False,
+        scatter_thin=1,
+        scatter_max_points=100,
+        scatter_kwargs=scatter_kwargs,
+    )
+    panel = ax[1, 0]
+    assert len(_scatter_points(panel)) == 100
+    if "c" in scatter_kwargs:
+        rgb = matplotlib.colors.to_rgb(scatter_kwargs["c"])
+        assert np.allclose(panel.collections[-1].get_facecolors()[:, :3], rgb)
+    elif panel.lines:
+        assert panel.lines[-1].get_markersize() == np.sqrt(scatter_kwargs["s"])
+    else:
+        assert np.array_equal(panel.collections[-1].get_sizes(), scatter_kwargs["s"])
+
+
+def test_subsample_per_point_style():
+    x = np.random.default_rng(0).normal(size=(3, 500))
+    fig, ax = pears(
+        x,
+        kde=False,
+        scatter_thin=1,
+        scatter_max_points=100,
+        scatter_kwargs=dict(c=x[0]),
+    )
+    assert len(ax[1, 0].collections[-1].get_array()) == 100
+
+
+def test_subsample_all_per_point_styles():
+    x = np.random.default_rng(0).normal(size=(3, 500))
+    fig, ax = pears(
+        x,
+        kde=False,
+        scatter_thin=1,
+        scatter_max_points=100,
+        scatter_kwargs=dict(
+            c=np.arange(500),
+            alpha=np.linspace(0.1, 1, 500),
+            linewidths=np.linspace(0.5, 2, 500),
+        ),
+    )
+    fig.canvas.draw()
+    points = ax[1, 0].collections[-1]
+    assert len(points.get_linewidths()) == 100
+    # each point keeps its own linewidth, which increases along with c
+    order = np.argsort(points.get_array())
+    assert np.all(np.diff(np.asarray(points.get_linewidths())[order]) > 0)
+
+
+def test_subsample_per_point_facecolors():
+    x = np.random.default_rng(0).normal(size=(3, 500))
+    fig, ax = pears(
+        x,
+        kde=False,
+        scatter_thin=1,
+        scatter_max_points=100,
+        scatter_kwargs=dict(facecolors=np.tile([1, 0, 0, 1.0], (500, 1))),
+    )
+    assert len(_scatter_points(ax[1, 0])) == 100
+
+
+def test_hollow_markers():
+    x = np.random.default_rng(0).normal(size=(3, 500))
+    fig, ax = pears(x, kde=False, scatter_kwargs=dict(facecolors="none"))
+    assert ax[1, 0].lines[-1].get_markerfacecolor() == "none"
+
+
+@pytest.mark.parametrize(
+    "scatter_kwargs",
+    [
+        dict(linewidths=np.linspace(0.5, 2, 500)),
+        dict(alpha=np.linspace(0.1, 1, 500)),
+        dict(linewidths=[2]),
+        dict(s=[5]),
+        dict(facecolors=np.tile([1, 0, 0, 1.0], (500, 1))),
+    ],
+)
+def test_per_point_style_uses_scatter(scatter_kwargs):
+    x = np.random.default_rng(0).normal(size=(3, 500))
+    fig, ax = pears(x, kde=False, scatter_thin=1, scatter_kwargs=scatter_kwargs)
+    assert not ax[1, 0].lines
+    assert len(ax[1, 0].collections[-1].get_offsets()) == 500
+
+
+def test_limits_constant_column_and_nan_truth():
+    x = np.random.default_rng(0).normal(size=(3, 500))
+    x[2] = 1.0
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        fig, ax = pears(x, truths=[np.nan, 0, 1], kde=False)
+        fig.canvas.draw()
+    assert ax[2, 0].get_ylim() == pytest.approx((0.945, 1.055))